@@ -3,12 +3,14 @@ import re
 from datetime import datetime
 from typing import Dict, List
 
+from sqlalchemy.exc import IntegrityError
 from rich.console import Console
 from rich.table import Table
 from rich import box
 
-from ..database import crud
-from ..database.setup import session
+from ..database import backup, crud
+from .dashboard import watch
+from ..database.setup import Base, engine, session, upgrade_schema
 from ..models import Client, Project, Task
 from .constants import (
     MAIN_MENU_OPTIONS,
@@ -86,8 +88,8 @@ def add_client() -> None:
             print("Invalid email format. Please try again.")
     phone = input("Client phone: ")
     client = Client(name=name, email=email, phone=phone)
-    created_client = crud.create_client(session, client)
-    print("\n✔️\nClient added successfully.")
+    created_client = crud.upsert_client(session, client)
+    print("\n✔️\nClient saved successfully.")
     print(
         f"ID: {created_client.id}, Name: {created_client.name}, Email: {created_client.email}, Phone: {created_client.phone}"
     )
@@ -148,6 +150,8 @@ def view_menu() -> None:
         view_tasks()
     elif choice == 4:
         view_earnings()
+    elif choice == 5:
+        watch()
 
 def view_clients() -> None:
     """Displays all clients from the database."""
@@ -337,7 +341,12 @@ def update_client() -> None:
                 print("Invalid email format. Please try again.")
         phone = input(f"New phone [{client.phone}]: ") or client.phone
         
-        updated_client = crud.update_client(session, client_id, Client(name=name, email=email, phone=phone))
+        try:
+            updated_client = crud.update_client(session, client_id, Client(name=name, email=email, phone=phone))
+        except IntegrityError:
+            session.rollback()
+            print("\n⚠️\nAnother client already uses that email. \n")
+            return
         print("\n✔️\nClient updated succesfully. \n")
         print(
             f"ID: {updated_client.id}, Name: {updated_client.name}, Email: {updated_client.email}, Phone: {updated_client.phone}"
@@ -448,15 +457,132 @@ def cli() -> None:
         "\nThank you for using TackleTask Tracker. \nGoodbye!😉 \n=========================================== \n"
     )
 
+def merge_clients() -> None:
+    """Folds clients sharing an email together and enforces unique emails from then on."""
+    try:
+        upgrade_schema()
+    except IntegrityError:
+        pass
+    merged = crud.merge_duplicate_clients(session)
+    upgrade_schema()
+    print(f"\n✔️\nMerged {merged} duplicate client(s). \n")
+
+def snapshot() -> None:
+    """Takes an online snapshot of the database."""
+    try:
+        manifest = backup.create_snapshot()
+    except ValueError as error:
+        print(f"\n⚠️\n{error} \n")
+        return
+    print(
+        f"\n✔️\nSnapshot {manifest['name']} created ({manifest['new_chunks']} of {len(manifest['chunks'])} chunks new). \n"
+    )
+
+def list_snapshots() -> None:
+    """Displays all snapshots, oldest first."""
+    names = backup.list_snapshots()
+    if not names:
+        print("\n⚠️\nNo snapshots available! Take a snapshot first. \n")
+        return
+
+    table = Table(
+        title="Snapshots",
+        box=box.ROUNDED,
+        border_style="bright_blue",
+        header_style="bold magenta",
+        row_styles=["dim", ""],
+    )
+    table.add_column("Name", style="cyan", no_wrap=True)
+    table.add_column("Created", style="green")
+    table.add_column("Size (bytes)", justify="right", style="yellow")
+
+    for name in names:
+        manifest = backup.load_manifest(name)
+        table.add_row(name, manifest["created"], str(manifest["size"]))
+
+    console = Console()
+    console.print(table)
+
+def restore(name: str) -> None:
+    """Restores the database from a snapshot, defaulting to the latest one."""
+    names = backup.list_snapshots()
+    if not names:
+        print("\n⚠️\nNo snapshots available! Take a snapshot first. \n")
+        return
+    name = name or names[-1]
+    try:
+        backup.restore_snapshot(name)
+    except ValueError as error:
+        print(f"\n⚠️\n{error} \n")
+        return
+    print(f"\n✔️\nDatabase restored from snapshot {name}. \n")
+
+def prune(keep_last: int, keep_days: int) -> None:
+    """Deletes snapshots outside the retention policy."""
+    try:
+        deleted = backup.prune_snapshots(keep_last=keep_last, keep_days=keep_days)
+    except ValueError as error:
+        print(f"\n⚠️\n{error} \n")
+        return
+    print(f"\n✔️\nPruned {len(deleted)} snapshot(s). \n")
+
+def non_negative_int(value: str) -> int:
+    """Parses a command-line value that must be a whole number of zero or more."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a whole number")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"{value} must not be negative")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(description="TackleTask Tracker - your productivity partner.")
-    parser.add_argument('command', nargs='?', default=None, help="The command to execute.")
+    subparsers = parser.add_subparsers(
+        dest="command",
+        metavar="command",
+        help="The command to execute. Starts the interactive menu when omitted.",
+    )
+    subparsers.add_parser("merge-clients", help="Fold clients sharing an email together.")
+    subparsers.add_parser("watch", help="Show a live dashboard.")
+    subparsers.add_parser("snapshot", help="Take an online snapshot of the database.")
+    subparsers.add_parser("snapshots", help="List snapshots.")
+    restore_parser = subparsers.add_parser("restore", help="Restore the database from a snapshot.")
+    restore_parser.add_argument('name', nargs='?', default=None, help="Snapshot to restore (defaults to the latest).")
+    prune_parser = subparsers.add_parser("prune", help="Delete snapshots outside the retention policy.")
+    prune_parser.add_argument('--keep-last', type=non_negative_int, default=7, help="Newest snapshots to keep.")
+    prune_parser.add_argument('--keep-days', type=non_negative_int, default=None, help="Also keep snapshots taken within this many days.")
 
     args = parser.parse_args()
 
-    if args.command:
-        # This is a placeholder for future command-line specific functionality
-        cli()
+    # Restoring must not open the live database first: it may be the damaged
+    # file being recovered.
+    if args.command == "restore":
+        restore(args.name)
+        return
+
+    Base.metadata.create_all(engine)
+
+    if args.command == "merge-clients":
+        merge_clients()
+        return
+
+    try:
+        upgrade_schema()
+    except IntegrityError:
+        print(
+            "\n⚠️\nDuplicate client emails found. Run `python3 main.py merge-clients` to fold them together. \n"
+        )
+        return
+
+    if args.command == "watch":
+        watch()
+    elif args.command == "snapshot":
+        snapshot()
+    elif args.command == "snapshots":
+        list_snapshots()
+    elif args.command == "prune":
+        prune(args.keep_last, args.keep_days)
     else:
         cli()
 
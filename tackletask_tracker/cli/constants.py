@@ -8,7 +8,7 @@ MAIN_MENU_OPTIONS = {
 
 SUBMENU_OPTIONS = {
     "add": {1: "Client", 2: "Project", 3: "Task", 0: "Go back"},
-    "view": {1: "Clients", 2: "Projects", 3: "Tasks", 4: "Earnings", 0: "Go back"},
+    "view": {1: "Clients", 2: "Projects", 3: "Tasks", 4: "Earnings", 5: "Live dashboard", 0: "Go back"},
     "update": {1: "Client", 2: "Project", 3: "Task", 0: "Go back"},
     "delete": {1: "Client", 2: "Project", 3: "Task", 0: "Go back"},
 }
@@ -26,3 +26,7 @@ FILTER_TASKS_OPTIONS = {
     3: "See All",
     0: "Go back",
 }
+
+# Project statuses are typed in freely, so the live dashboard treats any of
+# these (ignoring case) as finished and leaves them out of overdue/due-soon.
+FINISHED_PROJECT_STATUSES = ("Completed", "Complete", "Done", "Finished", "Closed")
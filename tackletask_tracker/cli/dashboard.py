@@ -0,0 +1,133 @@
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, Tuple
+
+from rich.columns import Columns
+from rich.console import Console, Group
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+from rich import box
+from sqlalchemy.orm import Session
+
+from ..database import crud
+from ..database.setup import Session as SessionFactory
+from .constants import FINISHED_PROJECT_STATUSES
+
+POLL_INTERVAL = 0.5
+DUE_SOON_DAYS = 7
+
+
+def load_earnings(db: Session):
+    """Loads the earnings per task status."""
+    return crud.get_earnings_by_task_status(db)
+
+
+def load_due_projects(db: Session):
+    """Loads today's date and the unfinished projects that are overdue or due soon."""
+    today = date.today()
+    until = today + timedelta(days=DUE_SOON_DAYS)
+    return today, crud.get_open_projects_due_by(db, until, FINISHED_PROJECT_STATUSES)
+
+
+def load_status_counts(db: Session):
+    """Loads the project and task counts per status."""
+    return crud.get_project_status_counts(db), crud.get_task_status_counts(db)
+
+
+def render_earnings(earnings: Dict[str, float]) -> Panel:
+    """Builds the earnings panel from earnings per task status."""
+    table = Table(box=box.SIMPLE, header_style="bold magenta")
+    table.add_column("Task Status", style="green")
+    table.add_column("Earnings", justify="right", style="green")
+    for status, amount in sorted(earnings.items(), key=lambda item: str(item[0])):
+        table.add_row(str(status), f"Ksh. {amount}")
+    table.add_row("[bold]Total[/bold]", f"[bold]Ksh. {sum(earnings.values())}[/bold]")
+    return Panel(table, title="Earnings", border_style="bright_blue")
+
+
+def render_due_projects(due) -> Panel:
+    """Builds the panel of unfinished projects that are overdue or due soon."""
+    today, projects = due
+    table = Table(box=box.SIMPLE, header_style="bold cyan")
+    table.add_column("ID", justify="right", style="cyan", no_wrap=True)
+    table.add_column("Title", style="magenta")
+    table.add_column("Status", style="green")
+    table.add_column("Deadline")
+    table.add_column("Client ID", justify="right", style="cyan")
+    for project_id, title, deadline, status, client_id in projects:
+        deadline_style = "bold red" if deadline < today else "yellow"
+        table.add_row(
+            str(project_id),
+            title,
+            status,
+            f"[{deadline_style}]{deadline}[/{deadline_style}]",
+            str(client_id),
+        )
+    return Panel(
+        table,
+        title=f"Overdue & due within {DUE_SOON_DAYS} days",
+        border_style="bright_green",
+    )
+
+
+def render_status_counts(counts) -> Panel:
+    """Builds the panel of project and task counts per status."""
+    project_counts, task_counts = counts
+    table = Table(box=box.SIMPLE, header_style="bold blue")
+    table.add_column("Status", style="green")
+    table.add_column("Projects", justify="right", style="cyan")
+    table.add_column("Tasks", justify="right", style="cyan")
+    for status in sorted(set(project_counts) | set(task_counts), key=str):
+        table.add_row(
+            str(status),
+            str(project_counts.get(status, 0)),
+            str(task_counts.get(status, 0)),
+        )
+    return Panel(table, title="By Status", border_style="bright_yellow")
+
+
+PANELS: Dict[str, Tuple[Callable, Callable]] = {
+    "earnings": (load_earnings, render_earnings),
+    "status_counts": (load_status_counts, render_status_counts),
+    "due_projects": (load_due_projects, render_due_projects),
+}
+
+
+def watch() -> None:
+    """Shows a live dashboard that refreshes whenever the database changes. Press Ctrl+C to exit."""
+    db = SessionFactory()
+    data = {}
+    panels = {}
+    last_seen = None
+
+    try:
+        with Live(console=Console(), auto_refresh=False) as live:
+            while True:
+                # data_version only moves when another connection commits, so
+                # polling it is far cheaper than re-running the panel queries.
+                # The date is included so due-soon projects roll over at midnight.
+                current = (crud.get_data_version(db), date.today())
+                if current != last_seen:
+                    last_seen = current
+                    changed = False
+                    for name, (load, render) in PANELS.items():
+                        result = load(db)
+                        if name not in data or data[name] != result:
+                            data[name] = result
+                            panels[name] = render(result)
+                            changed = True
+                    if changed:
+                        live.update(
+                            Group(
+                                Columns([panels["earnings"], panels["status_counts"]]),
+                                panels["due_projects"],
+                                f"[dim]Updated {time.strftime('%H:%M:%S')} · Ctrl+C to exit[/dim]",
+                            ),
+                            refresh=True,
+                        )
+                time.sleep(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
@@ -0,0 +1,253 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import zlib
+from contextlib import closing, contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from .setup import db_folder, db_path
+
+backup_dir = os.path.join(db_folder, "snapshots")
+
+# Snapshots are split into chunks of this many database pages. Chunks are
+# stored compressed under their content hash, so a snapshot only writes the
+# chunks that changed since any earlier snapshot.
+CHUNK_PAGES = 256
+# gzip level for chunks; higher levels cost far more time for little extra saving.
+COMPRESS_LEVEL = 6
+
+
+def _chunks_dir(directory: str) -> str:
+    return os.path.join(directory, "chunks")
+
+
+def _manifests_dir(directory: str) -> str:
+    return os.path.join(directory, "manifests")
+
+
+def _chunk_path(directory: str, digest: str) -> str:
+    return os.path.join(_chunks_dir(directory), digest[:2], f"{digest}.gz")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def _lock(directory: str):
+    """Holds the snapshot directory's lock file, so snapshots, restores and prunes never overlap.
+
+    Raises ValueError if another one is in progress. A lock file left behind by a
+    crashed process can be deleted by hand.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, ".lock")
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        raise ValueError(f"Another snapshot, restore or prune is in progress (lock file {path}).")
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        os.remove(path)
+
+
+def _is_readable_database(path: str) -> bool:
+    """Checks that a file exists and SQLite can read its schema."""
+    if not os.path.exists(path):
+        return False
+    try:
+        with closing(sqlite3.connect(path)) as conn:
+            conn.execute("PRAGMA schema_version").fetchone()
+        return True
+    except sqlite3.DatabaseError:
+        return False
+
+
+def _copy_database(source_path: str, target_path: str) -> None:
+    """Copies a database with SQLite's online backup API, without blocking writers."""
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        # One step, no sleeping: in WAL mode (see setup.py) the copy reads a
+        # consistent snapshot while writers carry on, whereas a multi-step copy
+        # restarts from scratch whenever another connection commits between steps.
+        source.backup(target, pages=-1, sleep=0)
+    finally:
+        target.close()
+        source.close()
+
+
+def list_snapshots(directory: str = backup_dir) -> List[str]:
+    """Lists snapshot names, oldest first."""
+    manifests = _manifests_dir(directory)
+    if not os.path.isdir(manifests):
+        return []
+    return sorted(name[:-5] for name in os.listdir(manifests) if name.endswith(".json"))
+
+
+def load_manifest(name: str, directory: str = backup_dir) -> Dict:
+    """Loads the manifest describing a snapshot."""
+    path = os.path.join(_manifests_dir(directory), f"{name}.json")
+    if not os.path.exists(path):
+        raise ValueError(f"Snapshot {name} not found.")
+    with open(path) as f:
+        return json.load(f)
+
+
+def create_snapshot(source_path: str = db_path, directory: str = backup_dir) -> Dict:
+    """Takes a compressed, incremental snapshot of the database while it stays in use.
+
+    Returns the snapshot manifest, including how many chunks were newly written.
+    Raises ValueError if another snapshot, restore or prune is in progress.
+    """
+    with _lock(directory):
+        return _create_snapshot(source_path, directory)
+
+
+def _create_snapshot(source_path: str, directory: str) -> Dict:
+    fd, copy_path = tempfile.mkstemp(dir=directory, suffix=".db")
+    os.close(fd)
+    try:
+        _copy_database(source_path, copy_path)
+        with closing(sqlite3.connect(copy_path)) as copy:
+            page_size = copy.execute("PRAGMA page_size").fetchone()[0]
+
+        chunks = []
+        new_chunks = 0
+        with open(copy_path, "rb") as f:
+            while True:
+                data = f.read(page_size * CHUNK_PAGES)
+                if not data:
+                    break
+                digest = hashlib.sha256(data).hexdigest()
+                path = _chunk_path(directory, digest)
+                if not os.path.exists(path):
+                    _write_atomic(path, gzip.compress(data, compresslevel=COMPRESS_LEVEL))
+                    new_chunks += 1
+                chunks.append(digest)
+        size = os.path.getsize(copy_path)
+    finally:
+        os.remove(copy_path)
+
+    created = datetime.now()
+    manifest = {
+        "name": created.strftime("%Y%m%d-%H%M%S-%f"),
+        "created": created.isoformat(),
+        "page_size": page_size,
+        "size": size,
+        "chunks": chunks,
+        "new_chunks": new_chunks,
+    }
+    _write_atomic(
+        os.path.join(_manifests_dir(directory), f"{manifest['name']}.json"),
+        json.dumps(manifest, indent=2).encode(),
+    )
+    return manifest
+
+
+def restore_snapshot(name: str, target_path: str = db_path, directory: str = backup_dir) -> None:
+    """Restores a snapshot into the database after verifying its chunks and integrity.
+
+    Raises ValueError if the snapshot is missing, damaged or fails SQLite's integrity check,
+    in which case the database is left untouched. A missing or unreadable database is
+    replaced outright, so a damaged database can be recovered.
+    """
+    with _lock(directory):
+        _restore_snapshot(name, target_path, directory)
+
+
+def _restore_snapshot(name: str, target_path: str, directory: str) -> None:
+    manifest = load_manifest(name, directory)
+    # Built next to the target so it can be moved into place in one rename.
+    target_folder = os.path.dirname(os.path.abspath(target_path))
+    fd, restored_path = tempfile.mkstemp(dir=target_folder, suffix=".db")
+    try:
+        with os.fdopen(fd, "wb") as restored:
+            for digest in manifest["chunks"]:
+                path = _chunk_path(directory, digest)
+                if not os.path.exists(path):
+                    raise ValueError(f"Snapshot {name} is missing chunk {digest}.")
+                try:
+                    with open(path, "rb") as f:
+                        data = gzip.decompress(f.read())
+                except (OSError, EOFError, zlib.error):
+                    raise ValueError(f"Snapshot {name} has a corrupted chunk {digest}.")
+                if hashlib.sha256(data).hexdigest() != digest:
+                    raise ValueError(f"Snapshot {name} has a corrupted chunk {digest}.")
+                restored.write(data)
+
+        try:
+            with closing(sqlite3.connect(restored_path)) as restored:
+                result = restored.execute("PRAGMA integrity_check").fetchone()[0]
+        except sqlite3.DatabaseError as error:
+            raise ValueError(f"Snapshot {name} failed the integrity check: {error}")
+        if result != "ok":
+            raise ValueError(f"Snapshot {name} failed the integrity check: {result}")
+
+        if _is_readable_database(target_path):
+            # Copying through the backup API swaps the contents in under SQLite's
+            # locks, so open connections see the restored data rather than a torn file.
+            _copy_database(restored_path, target_path)
+        else:
+            # A damaged database cannot be opened as a backup target, so the
+            # verified copy replaces it, along with any journal left beside it.
+            for suffix in ("-journal", "-wal", "-shm"):
+                if os.path.exists(target_path + suffix):
+                    os.remove(target_path + suffix)
+            os.replace(restored_path, target_path)
+    finally:
+        if os.path.exists(restored_path):
+            os.remove(restored_path)
+
+
+def prune_snapshots(
+    keep_last: int = 7, keep_days: Optional[int] = None, directory: str = backup_dir
+) -> List[str]:
+    """Deletes snapshots outside the retention policy and any chunks no longer referenced.
+
+    Keeps the newest `keep_last` snapshots, plus any taken within the last `keep_days` days.
+    Returns the names of the deleted snapshots. Raises ValueError for negative retention values,
+    or if another snapshot, restore or prune is in progress.
+    """
+    if keep_last < 0 or (keep_days is not None and keep_days < 0):
+        raise ValueError("Retention values must not be negative.")
+    with _lock(directory):
+        return _prune_snapshots(keep_last, keep_days, directory)
+
+
+def _prune_snapshots(keep_last: int, keep_days: Optional[int], directory: str) -> List[str]:
+    names = list_snapshots(directory)
+    cutoff = datetime.now() - timedelta(days=keep_days) if keep_days is not None else None
+    kept = set(names[-keep_last:]) if keep_last > 0 else set()
+
+    referenced = set()
+    deleted = []
+    for name in names:
+        manifest = load_manifest(name, directory)
+        if name in kept or (cutoff and datetime.fromisoformat(manifest["created"]) >= cutoff):
+            referenced.update(manifest["chunks"])
+        else:
+            os.remove(os.path.join(_manifests_dir(directory), f"{name}.json"))
+            deleted.append(name)
+
+    chunks = _chunks_dir(directory)
+    if os.path.isdir(chunks):
+        for prefix in os.listdir(chunks):
+            prefix_dir = os.path.join(chunks, prefix)
+            for filename in os.listdir(prefix_dir):
+                if filename[:-3] not in referenced:
+                    os.remove(os.path.join(prefix_dir, filename))
+            if not os.listdir(prefix_dir):
+                os.rmdir(prefix_dir)
+    return deleted
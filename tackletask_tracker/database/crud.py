@@ -1,7 +1,36 @@
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session
 from .. import models
-from datetime import datetime
-from typing import List
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Tuple
+
+# Host parameters allowed per statement by SQLite builds older than 3.32.
+SQLITE_MAX_VARIABLES = 999
+
+
+def _bulk_upsert(db: Session, model, rows: List[Dict], key: str) -> None:
+    """Inserts rows, updating those whose `key` already exists, one statement per batch.
+
+    Rows are grouped by the columns they supply, so an existing row is only
+    updated with the values actually given for it.
+    """
+    table = model.__table__
+    groups: Dict[Tuple[str, ...], List[Dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    for columns, group in groups.items():
+        batch_size = max(1, SQLITE_MAX_VARIABLES // len(columns))
+        for start in range(0, len(group), batch_size):
+            stmt = insert(table).values(group[start:start + batch_size])
+            updates = {c: stmt.excluded[c] for c in columns if c != key}
+            if updates:
+                stmt = stmt.on_conflict_do_update(index_elements=[table.c[key]], set_=updates)
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[table.c[key]])
+            db.execute(stmt)
+    db.commit()
 
 
 def get_client(db: Session, client_id: int) -> models.Client:
@@ -22,6 +51,64 @@ def create_client(db: Session, client: models.Client) -> models.Client:
     return client
 
 
+def get_client_by_email(db: Session, email: str) -> models.Client:
+    """Gets a client by email, ignoring case and surrounding whitespace."""
+    email = models.Client.normalize_email(email)
+    return db.query(models.Client).filter(models.Client.email == email).first()
+
+
+def upsert_client(db: Session, client: models.Client) -> models.Client:
+    """Creates a client, or updates the existing client with the same email."""
+    stmt = insert(models.Client).values(name=client.name, email=client.email, phone=client.phone)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Client.email],
+        set_={"name": stmt.excluded.name, "phone": stmt.excluded.phone},
+    )
+    # RETURNING gives the inserted or updated row's id; a lookup by email
+    # would be ambiguous for clients without one.
+    client_id = db.execute(stmt.returning(models.Client.id)).scalar_one()
+    db.commit()
+    db_client = get_client(db, client_id)
+    db.refresh(db_client)
+    return db_client
+
+
+def upsert_clients(db: Session, clients: List[Dict]) -> None:
+    """Creates or updates clients in bulk, keyed by email."""
+    rows = [{**c, "email": models.Client.normalize_email(c["email"])} for c in clients]
+    _bulk_upsert(db, models.Client, rows, "email")
+
+
+def merge_duplicate_clients(db: Session) -> int:
+    """Folds clients sharing an email into the oldest one, repointing their projects.
+
+    Returns the number of duplicate clients removed.
+    """
+    keepers = {}
+    duplicates = {}
+    for client_id, email in db.query(models.Client.id, models.Client.email).order_by(models.Client.id):
+        normalized = models.Client.normalize_email(email)
+        if not normalized:
+            continue
+        if normalized in keepers:
+            duplicates[client_id] = keepers[normalized]
+        else:
+            keepers[normalized] = client_id
+
+    for duplicate_id, keeper_id in duplicates.items():
+        db.query(models.Project).filter(models.Project.client_id == duplicate_id).update(
+            {models.Project.client_id: keeper_id}, synchronize_session=False
+        )
+    if duplicates:
+        db.query(models.Client).filter(models.Client.id.in_(list(duplicates))).delete(synchronize_session=False)
+    db.query(models.Client).filter(models.Client.email.isnot(None)).update(
+        {models.Client.email: func.lower(func.trim(models.Client.email))}, synchronize_session=False
+    )
+    db.commit()
+    db.expire_all()
+    return len(duplicates)
+
+
 def update_client(db: Session, client_id: int, client: models.Client) -> models.Client:
     """Updates a client."""
     db_client = db.query(models.Client).filter(models.Client.id == client_id).first()
@@ -40,6 +127,11 @@ def delete_client(db: Session, client_id: int) -> None:
     db.commit()
 
 
+def get_data_version(db: Session) -> int:
+    """Gets SQLite's data version, which changes whenever another connection commits."""
+    return db.connection().exec_driver_sql("PRAGMA data_version").scalar()
+
+
 def get_project(db: Session, project_id: int) -> models.Project:
     """Gets a project by ID."""
     return db.query(models.Project).filter(models.Project.id == project_id).first()
@@ -60,6 +152,41 @@ def get_projects_by_deadline(db: Session, deadline: datetime) -> List[models.Pro
     return db.query(models.Project).filter(models.Project.deadline == deadline).all()
 
 
+def get_open_projects_due_by(db: Session, until: date, finished_statuses: Iterable[str]) -> List[Tuple]:
+    """Gets (id, title, deadline, status, client_id) of unfinished projects due on or before a date.
+
+    A project is finished when its status matches one of `finished_statuses`, ignoring case.
+    """
+    finished = [status.lower() for status in finished_statuses]
+    return (
+        db.query(
+            models.Project.id,
+            models.Project.title,
+            models.Project.deadline,
+            models.Project.project_status,
+            models.Project.client_id,
+        )
+        .filter(models.Project.deadline <= until)
+        .filter(
+            or_(
+                models.Project.project_status.is_(None),
+                func.lower(func.trim(models.Project.project_status)).notin_(finished),
+            )
+        )
+        .order_by(models.Project.deadline, models.Project.id)
+        .all()
+    )
+
+
+def get_project_status_counts(db: Session) -> Dict[str, int]:
+    """Gets the number of projects per status."""
+    return dict(
+        db.query(models.Project.project_status, func.count(models.Project.id))
+        .group_by(models.Project.project_status)
+        .all()
+    )
+
+
 def create_project(db: Session, project: models.Project) -> models.Project:
     """Creates a new project."""
     db.add(project)
@@ -68,6 +195,11 @@ def create_project(db: Session, project: models.Project) -> models.Project:
     return project
 
 
+def upsert_projects(db: Session, projects: List[Dict]) -> None:
+    """Creates or updates projects in bulk, keyed by external_id."""
+    _bulk_upsert(db, models.Project, projects, "external_id")
+
+
 def update_project(db: Session, project_id: int, project: models.Project) -> models.Project:
     """Updates a project."""
     db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
@@ -107,6 +239,27 @@ def get_tasks_by_deadline(db: Session, deadline: datetime) -> List[models.Task]:
     return db.query(models.Task).join(models.Project).filter(models.Project.deadline == deadline).all()
 
 
+def get_earnings_by_task_status(db: Session) -> Dict[str, float]:
+    """Gets the total earnings of tasks per status."""
+    return dict(
+        db.query(
+            models.Task.status,
+            func.coalesce(func.sum(models.Task.hours_worked * models.Task.rate_per_hour), 0),
+        )
+        .group_by(models.Task.status)
+        .all()
+    )
+
+
+def get_task_status_counts(db: Session) -> Dict[str, int]:
+    """Gets the number of tasks per status."""
+    return dict(
+        db.query(models.Task.status, func.count(models.Task.id))
+        .group_by(models.Task.status)
+        .all()
+    )
+
+
 def create_task(db: Session, task: models.Task) -> models.Task:
     """Creates a new task."""
     db.add(task)
@@ -115,6 +268,11 @@ def create_task(db: Session, task: models.Task) -> models.Task:
     return task
 
 
+def upsert_tasks(db: Session, tasks: List[Dict]) -> None:
+    """Creates or updates tasks in bulk, keyed by external_id."""
+    _bulk_upsert(db, models.Task, tasks, "external_id")
+
+
 def update_task(db: Session, task_id: int, task: models.Task) -> models.Task:
     """Updates a task."""
     db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
@@ -1,5 +1,6 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 db_folder = os.path.dirname(os.path.abspath(__file__))
@@ -9,3 +10,56 @@ Base = declarative_base()
 engine = create_engine(f"sqlite:///{db_path}")
 Session = sessionmaker(bind=engine)
 session = Session()
+
+
+@event.listens_for(engine, "connect")
+def enable_wal(dbapi_connection, connection_record) -> None:
+    """Switches the database to WAL so readers (dashboards, snapshots) never block writers."""
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+
+def upgrade_schema(bind=engine) -> None:
+    """Adds columns and indexes introduced after the database was first created.
+
+    Each index is built in its own transaction, so one that cannot be created
+    does not hold back the others. Raises IntegrityError afterwards if a unique
+    index could not be built because of existing duplicates (e.g. clients
+    sharing an email); run `merge-clients` first.
+    """
+    inspector = inspect(bind)
+    missing_columns = {}
+    missing_indexes = []
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        missing_columns[table] = [c for c in table.columns if c.name not in existing]
+        existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        missing_indexes.extend(i for i in table.indexes if i.name not in existing_indexes)
+    # Nothing is written once the schema is current, so launching a command
+    # does not bump the file or wake open dashboards.
+    if not missing_indexes and not any(missing_columns.values()):
+        return
+
+    with bind.begin() as conn:
+        for table, columns in missing_columns.items():
+            for column in columns:
+                column_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+    # Emails are compared in normalized form (see Client.normalize_email), so
+    # legacy rows must be normalized before the unique index can catch duplicates.
+    with bind.begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE clients SET email = lower(trim(email)) "
+                "WHERE email IS NOT NULL AND email <> lower(trim(email))"
+            )
+        )
+
+    failure = None
+    for index in missing_indexes:
+        try:
+            with bind.begin() as conn:
+                index.create(conn)
+        except IntegrityError as error:
+            failure = failure or error
+    if failure is not None:
+        raise failure
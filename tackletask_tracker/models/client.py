@@ -1,14 +1,29 @@
+import string
+
 from sqlalchemy import Column, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from ..database.setup import Base
 
+# Matches SQLite's lower(), which only folds ASCII letters.
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
 
 class Client(Base):
     __tablename__ = "clients"
 
     id = Column(Integer, primary_key=True)
     name = Column(String)
-    email = Column(String)
+    email = Column(String, unique=True, index=True)
     phone = Column(String)
 
     projects = relationship("Project", back_populates="client", cascade="all, delete-orphan")
+
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        """Normalizes an email the same way as SQL `lower(trim(email))`, so case and space variants match."""
+        return email.strip(" ").translate(_ASCII_LOWER) if email else email
+
+    @validates("email")
+    def validate_email(self, key: str, email: str) -> str:
+        """Stores emails in their normalized form."""
+        return self.normalize_email(email)
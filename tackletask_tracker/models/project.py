@@ -12,6 +12,7 @@ class Project(Base):
     deadline = Column(Date)
     client_id = Column(Integer, ForeignKey("clients.id"))
     project_status = Column(String, default="Pending")
+    external_id = Column(String, unique=True, index=True)
 
     client = relationship("Client", back_populates="projects")
     tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
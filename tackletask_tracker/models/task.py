@@ -12,6 +12,7 @@ class Task(Base):
     rate_per_hour = Column(Float)
     project_id = Column(Integer, ForeignKey("projects.id"))
     status = Column(String, default="Pending")
+    external_id = Column(String, unique=True, index=True)
 
     project = relationship("Project", back_populates="tasks")
 